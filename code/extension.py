@@ -5,19 +5,23 @@ import contextlib
 import csv
 import dataclasses
 import datetime
-import json
+import functools
+import io
+import itertools
 import logging
 import re
-import time
 import zoneinfo
-from collections.abc import Iterable, Mapping
+from collections.abc import Iterable, Iterator, Mapping
 from typing import Any, Literal
 
 import aind_codeocean_pipeline_monitor.models
+import boto3
+import botocore.config
 import codeocean.computation
 import codeocean.data_asset
 import npc_io
 import npc_session
+import orjson
 import upath
 from typing_extensions import Self
 
@@ -26,13 +30,136 @@ import aind_session.extensions
 import aind_session.utils
 import aind_session.utils.codeocean_utils
 import aind_session.utils.misc_utils
-import aind_session.utils.s3_utils
 from aind_session.extensions.ecephys import EcephysExtension
 
 logger = logging.getLogger(__name__)
 
 SCRATCH_STORAGE_DIR = upath.UPath("s3://aind-scratch-data/aind-session")
 
+S3_MAX_POOL_CONNECTIONS = 64
+"""Default of 10 connections per client caps the number of concurrent S3 requests
+when reading many files from threads."""
+
+
+@functools.cache
+def get_s3_client():
+    """A boto3 S3 client shared by all S3 requests made directly (i.e. not via
+    `upath`) in this module."""
+    return boto3.client(
+        "s3",
+        config=botocore.config.Config(max_pool_connections=S3_MAX_POOL_CONNECTIONS),
+    )
+
+
+def get_bucket_and_key(path: npc_io.PathLike) -> tuple[str, str]:
+    """Split an S3 path into bucket name and object key (or prefix, for a dir).
+
+    Examples
+    --------
+    >>> get_bucket_and_key("s3://aind-scratch-data/aind-session/neuroglancer_states")
+    ('aind-scratch-data', 'aind-session/neuroglancer_states')
+    """
+    path = npc_io.from_pathlike(path)
+    if path.protocol != "s3":
+        raise ValueError(f"Expected S3 path, got {path}")
+    bucket, _, key = path.path.partition("/")
+    return bucket, key.strip("/")
+
+
+def iter_s3_objects(path: npc_io.PathLike) -> Iterator[dict[str, Any]]:
+    """Yield the metadata of every object under an S3 dir (recursively), from a single
+    paginated listing, up to 1000 objects per request.
+
+    - each item is an entry from the `Contents` of a `list_objects_v2` response,
+      including 'Key', 'LastModified' and 'Size'
+    """
+    bucket, prefix = get_bucket_and_key(path)
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=f"{prefix}/"):
+        yield from page.get("Contents", ())
+
+
+def put_object(path: npc_io.PathLike, body: bytes) -> upath.UPath:
+    """Write bytes to a file and return the path. Files on S3 are written with a
+    single PUT request, without fsspec's buffering or multipart upload.
+
+    - S3 has strong read-after-write consistency, so the file is visible as soon
+      as this returns
+    """
+    path = npc_io.from_pathlike(path)
+    if path.protocol == "s3":
+        bucket, key = get_bucket_and_key(path)
+        get_s3_client().put_object(Bucket=bucket, Key=key, Body=body)
+    else:
+        path.write_bytes(body)
+    return path
+
+
+def create_data_asset_from_dir(
+    path: npc_io.PathLike,
+    name: str,
+    tags: list[str],
+    wait_until_ready: bool = True,
+) -> codeocean.data_asset.DataAsset:
+    """Create an internal CodeOcean data asset from the contents of a dir on S3.
+
+    - waits until the asset is ready, with its files visible, before returning,
+      unless `wait_until_ready=False`
+    """
+    bucket, prefix = get_bucket_and_key(path)
+    asset_params = codeocean.data_asset.DataAssetParams(
+        name=name,
+        mount=name,
+        tags=tags,
+        source=codeocean.data_asset.Source(
+            aws=codeocean.data_asset.AWSS3Source(
+                bucket=bucket,
+                prefix=prefix,
+                keep_on_external_storage=False,
+                public=False,
+            )
+        ),
+    )
+    logger.debug(f"Creating asset {asset_params.name}")
+    asset = aind_session.utils.codeocean_utils.get_codeocean_client().data_assets.create_data_asset(
+        asset_params
+    )
+    if not wait_until_ready:
+        return asset
+    logger.debug(f"Waiting for new asset {asset.name} to be ready")
+    updated_asset = aind_session.utils.codeocean_utils.wait_until_ready(
+        data_asset=asset,
+        check_files=True,
+        timeout=60,
+    )
+    logger.debug(f"Asset {updated_asset.name} is ready")
+    return updated_asset
+
+
+def wait_until_all_ready(
+    data_assets: Iterable[codeocean.data_asset.DataAsset],
+    timeout: float = 60,
+) -> tuple[codeocean.data_asset.DataAsset, ...]:
+    """Wait for multiple new data assets to be ready, with their files visible, and
+    return the updated assets in the same order.
+
+    - waits run concurrently, so the total time is that of the slowest asset
+    """
+    data_assets = tuple(data_assets)
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(data_assets) or 1
+    ) as executor:
+        return tuple(
+            executor.map(
+                functools.partial(
+                    aind_session.utils.codeocean_utils.wait_until_ready,
+                    check_files=True,
+                    timeout=timeout,
+                ),
+                data_assets,
+            )
+        )
+
 
 class NeuroglancerState:
 
@@ -59,14 +186,14 @@ class NeuroglancerState:
         self._session = None
         if isinstance(path_or_dict, str):
             with contextlib.suppress(Exception):
-                path_or_dict = json.loads(path_or_dict)
+                path_or_dict = orjson.loads(path_or_dict)
         if isinstance(path_or_dict, NeuroglancerState):
             self._session = path_or_dict._session
             self.content = path_or_dict.content
         elif isinstance(path_or_dict, Mapping):
             self.content = path_or_dict  # we won't mutate, so no need to copy
         else:
-            self.content = json.loads(npc_io.from_pathlike(path_or_dict).read_text())
+            self.content = orjson.loads(npc_io.from_pathlike(path_or_dict).read_bytes())
 
     def __repr__(self) -> str:
         """
@@ -89,17 +216,7 @@ class NeuroglancerState:
         >>> NeuroglancerState("tests/resources/example_neuroglancer_state.json").image_sources[0]
         'zarr://s3://aind-msma-morphology-data/test_data/SmartSPIM/SmartSPIM_717381_2024-07-03_10-49-01_stitched_2024-08-16_23-15-47/image_tile_fusing/OMEZarr/Ex_561_Em_593.ome.zarr/'
         """
-        with contextlib.suppress(KeyError):
-            return tuple(
-                (
-                    layer["source"]
-                    if isinstance(layer["source"], str)
-                    else layer["source"]["url"]
-                )
-                for layer in self.content["layers"]
-                if layer["type"] == "image"
-            )
-        return ()
+        return self._parsed_layers[0]
 
     @property
     def image_data_assets(self) -> tuple[codeocean.data_asset.DataAsset, ...]:
@@ -132,13 +249,8 @@ class NeuroglancerState:
         >>> NeuroglancerState("tests/resources/example_neuroglancer_state.json").session
         Session('SmartSPIM_717381_2024-07-03_10-49-01')
         """
-        session_ids = set()
         if self._session is None:
-            for source in self.image_sources:
-                try:
-                    session_ids.add(npc_session.AINDSessionRecord(source))
-                except ValueError:
-                    continue
+            session_ids = set(self._parsed_layers[2])
             if not session_ids:
                 raise ValueError(
                     "No session ID could be extracted from Neuroglancer state json (expected to extract SmartSPIM session ID from image source)"
@@ -160,13 +272,31 @@ class NeuroglancerState:
         >>> NeuroglancerState("tests/resources/example_neuroglancer_state.json").annotation_names
         ('268', '269', '270', '265', '263', '262', 'targets')
         """
-        names = []
-        with contextlib.suppress(KeyError):
-            for layer in self.content["layers"]:
-                if layer["type"] != "annotation":
+        return self._parsed_layers[1]
+
+    @functools.cached_property
+    def _parsed_layers(
+        self,
+    ) -> tuple[
+        tuple[str, ...], tuple[str, ...], frozenset[npc_session.AINDSessionRecord]
+    ]:
+        """Image source urls, annotation layer names and session IDs parsed from image
+        source urls, extracted in a single pass over the layers in the json."""
+        image_sources: list[str] = []
+        annotation_names: list[str] = []
+        session_ids: set[npc_session.AINDSessionRecord] = set()
+        for layer in self.content.get("layers", ()):
+            layer_type = layer.get("type")
+            if layer_type == "image" and (source := layer.get("source")) is not None:
+                url = source if isinstance(source, str) else source.get("url")
+                if not url:
                     continue
-                names.append(layer["name"])
-        return tuple(names)
+                image_sources.append(url)
+                with contextlib.suppress(ValueError):
+                    session_ids.add(npc_session.AINDSessionRecord(url))
+            elif layer_type == "annotation" and "name" in layer:
+                annotation_names.append(layer["name"])
+        return tuple(image_sources), tuple(annotation_names), frozenset(session_ids)
 
     @staticmethod
     def get_new_file_name(session_id: str) -> str:
@@ -180,9 +310,7 @@ class NeuroglancerState:
         # name is coupled with NeuroglancerExtension.state_json_data_assets
         return f"{session_id}_neuroglancer-state_{datetime.datetime.now(tz=zoneinfo.ZoneInfo('US/Pacific')):%Y-%m-%d_%H-%M-%S}.json"
 
-    def write(
-        self, path: npc_io.PathLike | None = None, timeout_sec: float = 10
-    ) -> upath.UPath:
+    def write(self, path: npc_io.PathLike | None = None) -> upath.UPath:
         """Write the Neuroglancer state json to file and return the path.
 
         If no path is provided, a new file name will be generated based on the session ID and current time,
@@ -207,27 +335,23 @@ class NeuroglancerState:
                 / name
             )
         logger.debug(f"Writing Neuroglancer annotation file to {path.as_posix()}")
-        path.write_text(json.dumps(self.content, indent=2))
-        t0 = time.time()
-        while time.time() - t0 < timeout_sec:
-            if path.exists():
-                break
-            time.sleep(1)
-        else:
-            raise TimeoutError(
-                f"Failed to write Neuroglancer annotation file to {path.as_posix()}: "
-                f"file not found after {timeout_sec} seconds"
-            )
+        put_object(
+            path,
+            orjson.dumps(
+                self.content, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ),
+        )
         logger.debug(f"Neuroglancer annotation file written to {path.as_posix()}")
         return path
 
     def create_data_asset(
-        self, path: npc_io.PathLike | None = None
+        self, path: npc_io.PathLike | None = None, wait_until_ready: bool = True
     ) -> codeocean.data_asset.DataAsset:
         """Create a CodeOcean data asset from the Neuroglancer state json file.
 
         - name and tags are created automatically based on the SmartSPIM session ID
-        - waits until the asset is ready before returning
+        - waits until the asset is ready before returning, unless `wait_until_ready=False`
+          (e.g. to wait for several new assets at once with `wait_until_all_ready()`)
 
         Examples
         --------
@@ -246,32 +370,12 @@ class NeuroglancerState:
             path = self.write()
         else:
             path = npc_io.from_pathlike(path)
-        bucket, prefix = aind_session.utils.s3_utils.get_bucket_and_prefix(path)
-        asset_params = codeocean.data_asset.DataAssetParams(
+        return create_data_asset_from_dir(
+            path.parent,
             name=path.stem,
-            mount=path.stem,
             tags=["neuroglancer", "ecephys", "annotation", self.session.subject.id],
-            source=codeocean.data_asset.Source(
-                aws=codeocean.data_asset.AWSS3Source(
-                    bucket=bucket,
-                    prefix=prefix,
-                    keep_on_external_storage=False,
-                    public=False,
-                )
-            ),
-        )
-        logger.debug(f"Creating asset {asset_params.name}")
-        asset = aind_session.utils.codeocean_utils.get_codeocean_client().data_assets.create_data_asset(
-            asset_params
-        )
-        logger.debug(f"Waiting for new asset {asset.name} to be ready")
-        updated_asset = aind_session.utils.codeocean_utils.wait_until_ready(
-            data_asset=asset,
-            check_files=True,
-            timeout=60,
+            wait_until_ready=wait_until_ready,
         )
-        logger.debug(f"Asset {updated_asset.name} is ready")
-        return updated_asset
 
 
 @aind_session.register_namespace(name="ibl_data_converter", cls=aind_session.Subject)
@@ -282,8 +386,28 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
     def __init__(self, base: aind_session.Subject) -> None:
         self._base = base
         self.storage_dir = SCRATCH_STORAGE_DIR
-        self.use_data_assets_with_errors = False
-        self.use_data_assets_with_sorting_analyzer = True
+        self._use_data_assets_with_errors = False
+        self._use_data_assets_with_sorting_analyzer = True
+
+    @property
+    def use_data_assets_with_errors(self) -> bool:
+        """Include sorted data assets with errors in `sorted_data_assets`."""
+        return self._use_data_assets_with_errors
+
+    @use_data_assets_with_errors.setter
+    def use_data_assets_with_errors(self, value: bool) -> None:
+        self._use_data_assets_with_errors = value
+        self.__dict__.pop("sorted_data_assets", None)  # invalidate cached value
+
+    @property
+    def use_data_assets_with_sorting_analyzer(self) -> bool:
+        """Include sorted data assets from the sorting analyzer in `sorted_data_assets`."""
+        return self._use_data_assets_with_sorting_analyzer
+
+    @use_data_assets_with_sorting_analyzer.setter
+    def use_data_assets_with_sorting_analyzer(self, value: bool) -> None:
+        self._use_data_assets_with_sorting_analyzer = value
+        self.__dict__.pop("sorted_data_assets", None)  # invalidate cached value
 
     DATA_CONVERTER_CAPSULE_ID = "60569c31-be2d-4ccd-b60b-ab247824ec7c" # released version (version needs to be updated manually)
     """https://codeocean.allenneuraldynamics.org/capsule/6502580/tree"""
@@ -291,7 +415,26 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
     PIPELINE_MONITOR_CAPUSLE_ID = "567b5b98-8d41-413b-9375-9ca610ca2fd3"
     """Pipeline monitor capsule for capturing data assets e.g. https://codeocean.allenneuraldynamics.org/capsule/9889491/tree"""
     
-    @property
+    @functools.cached_property
+    def sessions_by_platform(self) -> dict[str, tuple[aind_session.Session, ...]]:
+        """All sessions associated with the subject, grouped by platform, each sorted by
+        ascending session date.
+
+        Examples
+        --------
+        >>> subject = aind_session.Subject(717381)
+        >>> subject.ibl_data_converter.sessions_by_platform["SmartSPIM"][0].id
+        'SmartSPIM_717381_2024-05-20_15-19-15'
+        """
+        platform_to_sessions: dict[str, list[aind_session.Session]] = {}
+        for session in self._base.sessions:
+            platform_to_sessions.setdefault(session.platform, []).append(session)
+        return {
+            platform: tuple(sessions)
+            for platform, sessions in platform_to_sessions.items()
+        }
+
+    @functools.cached_property
     def ecephys_sessions(self) -> tuple[aind_session.Session, ...]:
         """All ecephys sessions associated with the subject, sorted by ascending session date.
 
@@ -305,7 +448,7 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
             session for session in self._base.sessions if "ecephys" in session.modalities
         )
 
-    @property
+    @functools.cached_property
     def ecephys_data_assets(self) -> tuple[codeocean.data_asset.DataAsset, ...]:
         """All ecephys raw data assets associated with the subject, 0 or 1 per ecephys session,
         sorted in order of session date.
@@ -360,7 +503,7 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
             first_to_second_recording[first] = second
         return first_to_second_recording
 
-    @property
+    @functools.cached_property
     def sorted_data_assets(
         self,
     ) -> tuple[EcephysExtension.SortedDataAsset, ...]:
@@ -380,42 +523,50 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
         'ecephys_717381_2024-04-09_11-14-13_sorted_2024-04-10_22-15-25'
         """
 
-        def get_session_assets(
-            session: aind_session.Session,
-        ) -> tuple[EcephysExtension.SortedDataAsset, ...]:
-            return tuple(
-                a
-                for a in session.ecephys.sorted_data_assets
-                if (self.use_data_assets_with_errors or not a.is_sorting_error)
-                and (
-                    self.use_data_assets_with_sorting_analyzer
-                    or not a.is_sorting_analyzer
-                )
+        def is_usable(asset: EcephysExtension.SortedDataAsset) -> bool:
+            if not self.use_data_assets_with_errors and asset.is_sorting_error:
+                return False
+            if (
+                not self.use_data_assets_with_sorting_analyzer
+                and asset.is_sorting_analyzer
+            ):
+                return False
+            return True
+
+        # group the subject's assets (a single cached query) by session, instead of
+        # querying CodeOcean separately for each session
+        session_id_to_assets: dict[str, list[EcephysExtension.SortedDataAsset]] = {
+            session.id: [] for session in self.ecephys_sessions
+        }
+        for asset in self._base.data_assets:
+            try:
+                session_id = str(npc_session.AINDSessionRecord(asset.name))
+            except ValueError:
+                continue
+            if session_id not in session_id_to_assets:
+                continue
+            if not asset.name.startswith(f"{session_id}_sorted"):
+                continue
+            session_id_to_assets[session_id].append(
+                EcephysExtension.get_sorted_data_asset_model(asset)
             )
 
-        session_id_to_assets: dict[
-            str, tuple[EcephysExtension.SortedDataAsset, ...]
-        ] = {}
-        future_to_session: dict[concurrent.futures.Future, aind_session.Session] = {}
+        # checking for errors reads each asset's output file: do it concurrently
+        candidates = [a for assets in session_id_to_assets.values() for a in assets]
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            for session in self._base.sessions:
-                if "ecephys" not in session.modalities:
-                    continue
-                future = executor.submit(get_session_assets, session)
-                future_to_session[future] = session
-            for future in concurrent.futures.as_completed(future_to_session):
-                session = future_to_session[future]
-                assets_this_session = future.result()
-                if not assets_this_session:
-                    logger.warning(
-                        f"{session.id} has no sorted data in a non-errored state: cannot use for annotation"
-                    )
-                    continue
-                session_id_to_assets[session.id] = assets_this_session
+            asset_id_to_usable = dict(
+                zip((a.id for a in candidates), executor.map(is_usable, candidates))
+            )
+
         all_assets: list[EcephysExtension.SortedDataAsset] = []
-        for session in self._base.sessions:
-            if session.id in session_id_to_assets:
-                all_assets.extend(session_id_to_assets[session.id])
+        for session_id, assets in session_id_to_assets.items():
+            assets_this_session = [a for a in assets if asset_id_to_usable[a.id]]
+            if not assets_this_session:
+                logger.warning(
+                    f"{session_id} has no sorted data in a non-errored state: cannot use for annotation"
+                )
+                continue
+            all_assets.extend(assets_this_session)
         return tuple(all_assets)
 
     @property
@@ -428,13 +579,9 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
         >>> subject.ibl_data_converter.smartspim_sessions[0].id
         'SmartSPIM_717381_2024-05-20_15-19-15'
         """
-        return tuple(
-            session
-            for session in self._base.sessions
-            if session.platform == "SmartSPIM"
-        )
+        return self.sessions_by_platform.get("SmartSPIM", ())
 
-    @property
+    @functools.cached_property
     def smartspim_data_assets(self) -> tuple[codeocean.data_asset.DataAsset, ...]:
         """All SmartSPIM raw data assets associated with the subject, 0 or 1 per SmartSPIM session (latest only),
         sorted in order of session date.
@@ -643,6 +790,8 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
             )
 
         records = []
+        # computed once here: the property re-derives the mapping on every access
+        surface_recording_names = self.surface_recording_names
 
         ng_probe_mmdd = self.get_probe_mmdd_from_ng_state(neuroglancer_state)
         ng_probe_day = self.get_mindscope_probe_day_from_ng_state(neuroglancer_state)
@@ -669,7 +818,7 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
                     probe_id=ng_annotation,
                     sorted_recording=sorted_asset_name,
                     probe_file=neuroglancer_state_json_name,
-                    surface_finding=self.surface_recording_names.get(
+                    surface_finding=surface_recording_names.get(
                         sorted_asset_name.split("_sorted")[0]
                     ),
                 )
@@ -701,27 +850,35 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
                         probe_id=ng_annotation,
                         sorted_recording=sorted_asset_name,
                         probe_file=neuroglancer_state_json_name,
-                        surface_finding=self.surface_recording_names.get(
+                        surface_finding=surface_recording_names.get(
                             sorted_asset_name.split("_sorted")[0]
                         ),
                     )
                     records.append(row)
         else:
-            for annotation_name in neuroglancer_state.annotation_names:
-                for sorted_data_asset_name in sorted_data_asset_names:
-                    row = IBLDataConverterExtension.ManifestRecord(
-                        mouseid=self._base.id,
-                        probe_name="",
-                        probe_id=annotation_name,
-                        sorted_recording=sorted_data_asset_name,
-                        probe_file=neuroglancer_state_json_name,
-                        surface_finding=self.surface_recording_names.get(
-                            sorted_data_asset_name.split("_sorted")[0]
-                        ),
-                    )
-                    records.append(row)
+            sorted_data_asset_name_to_surface_finding = {
+                name: surface_recording_names.get(name.split("_sorted")[0])
+                for name in sorted_data_asset_names
+            }
+            for annotation_name, sorted_data_asset_name in itertools.product(
+                neuroglancer_state.annotation_names,
+                sorted_data_asset_name_to_surface_finding,
+            ):
+                row = IBLDataConverterExtension.ManifestRecord(
+                    mouseid=self._base.id,
+                    probe_name="",
+                    probe_id=annotation_name,
+                    sorted_recording=sorted_data_asset_name,
+                    probe_file=neuroglancer_state_json_name,
+                    surface_finding=sorted_data_asset_name_to_surface_finding[
+                        sorted_data_asset_name
+                    ],
+                )
+                records.append(row)
+        # fields are all flat values, so the recursive copy in `dataclasses.asdict` is
+        # unnecessary (rows are copied again by the autofill function)
         return self.autofill_manifest_probe_from_date_tag(
-            dataclasses.asdict(record) for record in records
+            vars(record) for record in records
         )
 
     @property
@@ -746,11 +903,14 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
         completed_records: Iterable[Mapping[str, Any]] | Iterable[ManifestRecord],
         asset_name: str | None = None,
         skip_existing: bool = True,
-        timeout_sec: float = 10,
+        wait_until_ready: bool = True,
     ) -> codeocean.data_asset.DataAsset:
         """Create a CodeOcean data asset from one or more completed annotation manifest records (see
         `self.get_partial_manifest()` and `ManifestRecord`).
 
+        - waits until the asset is ready before returning, unless `wait_until_ready=False`
+          (e.g. to wait for several new assets at once with `wait_until_all_ready()`)
+
         Examples
         --------
         >>> subject = aind_session.Subject(717381)
@@ -780,47 +940,17 @@ class IBLDataConverterExtension(aind_session.ExtensionBaseClass):
                     f"'probe_name' must be provided for each row in the manifest: {row}"
                 )
         logger.debug(f"Writing annotation manifest to {self.csv_manifest_path}")
-        with self.csv_manifest_path.open("w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=records[0].keys())
-            writer.writeheader()
-            writer.writerows(records)
-        t0 = time.time()
-        while time.time() - t0 < timeout_sec:
-            if self.csv_manifest_path.exists():
-                break
-            time.sleep(1)
-        else:
-            raise TimeoutError(
-                f"Failed to write annotation manifest to {self.csv_manifest_path}: "
-                f"file not found after {timeout_sec} seconds"
-            )
-        bucket, prefix = aind_session.utils.s3_utils.get_bucket_and_prefix(
-            self.csv_manifest_path
-        )
-        asset_params = codeocean.data_asset.DataAssetParams(
+        buffer = io.StringIO(newline="")
+        writer = csv.DictWriter(buffer, fieldnames=records[0].keys())
+        writer.writeheader()
+        writer.writerows(records)
+        put_object(self.csv_manifest_path, buffer.getvalue().encode())
+        return create_data_asset_from_dir(
+            self.csv_manifest_path.parent,
             name=asset_name or self.csv_manifest_path.stem,
-            mount=asset_name or self.csv_manifest_path.stem,
             tags=["ibl", "annotation", "manifest", self._base.id],
-            source=codeocean.data_asset.Source(
-                aws=codeocean.data_asset.AWSS3Source(
-                    bucket=bucket,
-                    prefix=prefix,
-                    keep_on_external_storage=False,
-                    public=False,
-                )
-            ),
-        )
-        logger.debug(f"Creating asset {asset_params.name}")
-        asset = aind_session.utils.codeocean_utils.get_codeocean_client().data_assets.create_data_asset(
-            asset_params
+            wait_until_ready=wait_until_ready,
         )
-        logger.debug(f"Waiting for new asset {asset.name} to be ready")
-        updated_asset = aind_session.utils.codeocean_utils.wait_until_ready(
-            data_asset=asset,
-            timeout=60,
-        )
-        logger.debug(f"Asset {updated_asset.name} is ready")
-        return updated_asset
 
     @property
     def manifest_data_asset(self) -> codeocean.data_asset.DataAsset:
@@ -1029,7 +1159,8 @@ class NeuroglancerExtension(aind_session.extension.ExtensionBaseClass):
         self,
     ) -> tuple[NeuroglancerState, ...]:
         """
-        All Neuroglancer state objects associated with the subject, one per state json file, sorted by file name.
+        All Neuroglancer state objects associated with the subject, one per state json file, sorted by
+        last-modified time (most-recent last).
 
         Examples
         --------
@@ -1037,12 +1168,17 @@ class NeuroglancerExtension(aind_session.extension.ExtensionBaseClass):
         >>> subject.neuroglancer.states[0]
         NeuroglancerState(SmartSPIM_717381_2024-07-03_10-49-01)
         """
-        return tuple(NeuroglancerState(p) for p in self.state_json_paths)
+        paths = self.state_json_paths
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(32, len(paths) or 1)
+        ) as executor:
+            return tuple(executor.map(NeuroglancerState, paths))
 
     @property
     def state_json_paths(self) -> tuple[upath.UPath, ...]:
         """
-        Paths to all Neuroglancer state .json files in temporary storage associated with the subject, sorted by file name.
+        Paths to all Neuroglancer state .json files in temporary storage associated with the subject, sorted by
+        last-modified time (most-recent last).
 
         Examples
         --------
@@ -1051,11 +1187,21 @@ class NeuroglancerExtension(aind_session.extension.ExtensionBaseClass):
         >>> paths[0].name  # doctest: +SKIP
         'SmartSPIM_717381_2024-07-03_10-49-01_neuroglancer-state_2024-08-16_23-15-47.json'
         """
+        # a single paginated listing of the whole prefix is much faster than
+        # `rglob`, which walks each subfolder separately
+        bucket, _ = get_bucket_and_key(self.state_json_dir)
+        objects: list[tuple[datetime.datetime, str]] = []
+        for obj in iter_s3_objects(self.state_json_dir):
+            name = obj["Key"].rpartition("/")[2]
+            if f"_{self._base.id}_" in name and name.endswith(".json"):
+                # modification time comes with the listing: no need to stat each file
+                objects.append((obj["LastModified"], obj["Key"]))
         return tuple(
-            sorted(
-                self.state_json_dir.rglob(f"*_{self._base.id}_*.json"),
-                key=lambda p: p.stem,
+            upath.UPath(
+                f"s3://{bucket}/{key}",
+                config_kwargs={"max_pool_connections": S3_MAX_POOL_CONNECTIONS},
             )
+            for _, key in sorted(objects)
         )
 
     @property
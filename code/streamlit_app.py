@@ -7,18 +7,26 @@
 - button linked to writing assets and launching the pipeline
 """
 
+import collections
 import concurrent.futures
-import json
+import itertools
 import logging
 
+import aind_session
+import orjson
 import pandas as pd
 import streamlit as st
 import streamlit.logger
+import upath
 
 from extension import (
+    S3_MAX_POOL_CONNECTIONS,
     IBLDataConverterExtension,
     NeuroglancerExtension,
     NeuroglancerState,
+    get_bucket_and_key,
+    iter_s3_objects,
+    wait_until_all_ready,
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -27,30 +35,113 @@ logger = streamlit.logger.get_logger(__name__)
 
 st.set_page_config(layout="wide")
 
+PROBE_SHANK_OPTIONS = (0, 1, 2, 3)
+NG_STATE_CACHE_SIZE = 8
+"""Number of recently-loaded Neuroglancer states kept per session, so switching
+back to a previous selection doesn't re-read and re-parse the json."""
 
-def get_existing_json_paths():
-    paths = sorted(
-        NeuroglancerExtension.state_json_dir.rglob("*.json"),
-        key=lambda p: "_".join(p.stem.split("_")[-2:]),
-        reverse=True,
-    )
+
+@st.cache_data(ttl=60)
+def get_existing_json_paths() -> list[str]:
+    bucket, _ = get_bucket_and_key(NeuroglancerExtension.state_json_dir)
+    keys = [
+        obj["Key"]
+        for obj in iter_s3_objects(NeuroglancerExtension.state_json_dir)
+        if obj["Key"].endswith(".json")
+    ]
+    keys.sort(key=lambda k: k.removesuffix(".json").rsplit("_", 2)[-2:], reverse=True)
     logger.info(
-        f"Found {len(paths)} existing json files in {NeuroglancerExtension.state_json_dir}"
+        f"Found {len(keys)} existing json files in {NeuroglancerExtension.state_json_dir}"
     )
-    return paths
+    return [f"s3://{bucket}/{key}" for key in keys]
+
+
+@st.cache_resource(ttl=60)
+def get_ibl_data_converter(subject_id: str) -> IBLDataConverterExtension:
+    return aind_session.Subject(subject_id).ibl_data_converter
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_sorted_asset_df(subject_id: str) -> pd.DataFrame:
+    def helper(asset):
+        return (
+            asset.name,
+            list(asset.sorted_probes),
+            asset.sorter_name,
+            asset.is_sorting_analyzer,
+            asset.is_sorting_error,
+            asset.id,
+        )
+
+    assets = get_ibl_data_converter(subject_id).sorted_data_assets
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(S3_MAX_POOL_CONNECTIONS, len(assets) or 1)
+    ) as executor:
+        rows = list(executor.map(helper, assets))
+    names, probes, sorters, is_analyzer, is_error, ids = (
+        map(list, zip(*rows)) if rows else ([] for _ in range(6))
+    )
+    return pd.DataFrame(
+        {
+            "name": pd.Series(names, dtype=object),
+            "probes": pd.Series(probes, dtype=object),
+            "sorter": pd.Series(sorters, dtype=object),
+            "is_analyzer": pd.Series(is_analyzer, dtype=bool),
+            "is_error": pd.Series(is_error, dtype=bool),
+            "id": pd.Series(ids, dtype=object),
+        }
+    )
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_manifest_df(
+    subject_id: str,
+    neuroglancer_state_json_name: str,
+    sorted_data_asset_names: tuple[str, ...],
+) -> pd.DataFrame:
+    records = get_ibl_data_converter(subject_id).get_partial_manifest_records(
+        sorted_data_asset_names=sorted_data_asset_names,
+        neuroglancer_state_json_name=neuroglancer_state_json_name,
+    )
+    return pd.DataFrame(records).sort_values(
+        ["sorted_recording", "probe_id"], ignore_index=True, kind="stable"
+    )
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_state_json(path: str, state_id: int, _state: NeuroglancerState) -> str:
+    # `state_id` is part of the key as file names are only unique to the second
+    return orjson.dumps(_state.content).decode()
 
 
 existing_paths = get_existing_json_paths()
 
-st.session_state.setdefault("ng_state", None)
-st.session_state.setdefault("ng_path", None)
+for key, default in (
+    ("ng_state", None),
+    ("ng_path", None),
+    ("ng_state_cache", collections.OrderedDict()),
+):
+    st.session_state.setdefault(key, default)
+
+
+def get_ng_state(path: upath.UPath) -> NeuroglancerState:
+    """Get a state from the session's LRU cache, or read it from `path`."""
+    cache = st.session_state["ng_state_cache"]
+    key = str(path)
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    state = cache[key] = NeuroglancerState(path)
+    if len(cache) > NG_STATE_CACHE_SIZE:
+        cache.popitem(last=False)
+    return state
 
 
 def update_ng_state(source: str) -> None:
     if source == "selectbox":
-        path = st.session_state["selectbox"]
+        path = upath.UPath(st.session_state["selectbox"])
         logger.info(f"Creating new NeuroglancerState from selectbox path: {path}")
-        st.session_state["ng_state"] = NeuroglancerState(path.read_text())
+        st.session_state["ng_state"] = get_ng_state(path)
         st.session_state["ng_path"] = path
     elif source == "text_input":
         logger.info("Creating new NeuroglancerState from text input")
@@ -58,6 +149,7 @@ def update_ng_state(source: str) -> None:
             st.session_state["text_input"]
         )
         st.session_state["ng_path"] = state.write()
+        get_existing_json_paths.clear()  # so the new file appears in the selectbox
     else:
         raise ValueError(f"Invalid source: {source}")
 
@@ -67,79 +159,62 @@ ng_path = st.selectbox(
     "Use an existing file:",
     options=existing_paths,
     index=None,
-    format_func=lambda p: p.stem,
+    format_func=lambda p: p.rpartition("/")[2].removesuffix(".json"),
     placeholder="Type to search...",
     key="selectbox",
     on_change=update_ng_state,
     kwargs={"source": "selectbox"},
 )
 
-user_input = st.text_input(
-    "Or create a new file:",
-    key="text_input",
-    placeholder="Paste json and hit Enter...",
-    on_change=update_ng_state,
-    kwargs={"source": "text_input"},
-)
+with st.form("new_json_form", clear_on_submit=False):
+    user_input = st.text_area(
+        "Or create a new file:",
+        key="text_input",
+        placeholder="Paste json and click Load...",
+    )
+    st.form_submit_button(
+        "Load",
+        on_click=update_ng_state,
+        kwargs={"source": "text_input"},
+    )
 
 if st.session_state["ng_path"] is not None:
-    st.json(json.loads(st.session_state["ng_path"].read_text()), expanded=1)
-
     state = st.session_state["ng_state"]
-    ibl_data_converter: IBLDataConverterExtension = (
-        state.session.subject.ibl_data_converter
+    st.json(
+        get_state_json(str(st.session_state["ng_path"]), id(state), state),
+        expanded=1,
     )
+    ibl_data_converter = get_ibl_data_converter(state.session.subject.id)
 
     # TODO allow user to select from available smartspim assets
 
-    def get_sorted_asset_df() -> pd.DataFrame:
-        if state is None:
-            return pd.DataFrame()
-
-        def helper(asset):
-            return {
-                "name": asset.name,
-                "probes": list(asset.sorted_probes),
-                "sorter": asset.sorter_name,
-                "is_analyzer": asset.is_sorting_analyzer,
-                "is_error": asset.is_sorting_error,
-                "id": asset.id,
-            }
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            records = executor.map(helper, ibl_data_converter.sorted_data_assets)
-        return pd.DataFrame.from_records(records)
-
     st.title("Select sorted data assets to use")
     st.info(
         "Remove unwanted sorted data assets by selecting rows (left) and using the trash can (right)"
     )
     sorted_asset_df = st.data_editor(
-        get_sorted_asset_df(),
+        get_sorted_asset_df(state.session.subject.id),
         num_rows="dynamic",
         hide_index=True,
         disabled=["name", "probes", "sorter", "is_analyzer", "is_error", "id"],
     )
 
-    def get_manifest_df() -> pd.DataFrame:
-        sorted_data_asset_names = sorted_asset_df["name"].tolist()
-        return (
-            pd.DataFrame(
-                ibl_data_converter.get_partial_manifest_records(
-                    sorted_data_asset_names=sorted_data_asset_names,
-                    neuroglancer_state_json_name=st.session_state["ng_path"].stem,
-                )
-            )
-            .sort_values(["sorted_recording", "probe_id"])
-            .reset_index()
-        )
-
     st.title("Create manifest file")
     st.info(
         "Fill out the `probe_name` column with names from Open Ephys and remove any unwanted rows"
     )
-    manifest_df = st.data_editor(
-        get_manifest_df(),
+    # editing the manifest or capsule settings doesn't rerun the app until the form
+    # is submitted; the sorted asset editor stays outside, as the manifest depends on it
+    manifest_form = st.form("manifest")
+    probe_options = tuple(
+        sorted(set(itertools.chain.from_iterable(sorted_asset_df["probes"])))
+    )
+    manifest_df = manifest_form.data_editor(
+        get_manifest_df(
+            state.session.subject.id,
+            st.session_state["ng_path"].stem,
+            tuple(sorted(sorted_asset_df["name"])),  # canonical order for cache key
+        ),
         num_rows="dynamic",
         hide_index=True,
         column_config={
@@ -147,14 +222,12 @@ if st.session_state["ng_path"] is not None:
             "sorted_recording": st.column_config.TextColumn(width="large"),
             "probe_name": st.column_config.SelectboxColumn(
                 width="small",
-                options={
-                    probe for sublist in sorted_asset_df["probes"] for probe in sublist
-                },
+                options=probe_options,
             ),
             "probe_file": st.column_config.TextColumn(width="large"),
             "probe_shank": st.column_config.SelectboxColumn(
                 width="small",
-                options=list(range(0, 4)),
+                options=PROBE_SHANK_OPTIONS,
             ),
             "probe_id": st.column_config.TextColumn(width="small"),
             "surface_finding": st.column_config.TextColumn(width="large"),
@@ -163,25 +236,38 @@ if st.session_state["ng_path"] is not None:
             ),
         },
     )
-    capsule_id = st.text_input(
+    capsule_id = manifest_form.text_input(
         "Data Converter capsule ID",
         value=ibl_data_converter.DATA_CONVERTER_CAPSULE_ID,
     )
-    capsule_version = st.number_input(
+    capsule_version = manifest_form.number_input(
         "Data Converter capsule release version",
         min_value=1,
         value=1,
         step=1,
         placeholder="None",
     )
-    if st.button("Launch data converter", type="primary"):
-        logger.info("Creating new Neuroglancer state data asset")
-        neuroglancer_state_json_asset = state.create_data_asset(path=st.session_state["ng_path"])
-
-        manifest_asset = ibl_data_converter.create_manifest_asset(
-            manifest_df.to_dict(orient="records"),
-            skip_existing=False,
-            timeout_sec=30,
+    if manifest_form.form_submit_button("Launch data converter", type="primary"):
+        logger.info("Creating new Neuroglancer state and manifest data assets")
+        columns = manifest_df.columns.tolist()
+        manifest_records = [
+            dict(zip(columns, row))
+            for row in manifest_df.itertuples(index=False, name=None)
+        ]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            neuroglancer_state_json_future = executor.submit(
+                state.create_data_asset,
+                path=st.session_state["ng_path"],
+                wait_until_ready=False,
+            )
+            manifest_future = executor.submit(
+                ibl_data_converter.create_manifest_asset,
+                manifest_records,
+                skip_existing=False,
+                wait_until_ready=False,
+            )
+        neuroglancer_state_json_asset, manifest_asset = wait_until_all_ready(
+            (neuroglancer_state_json_future.result(), manifest_future.result())
         )
         computation = ibl_data_converter.run_data_converter_capsule(
             capsule_id=capsule_id,